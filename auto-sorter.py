@@ -1,14 +1,26 @@
 import os
+import stat
+import errno
+import ctypes
 import shutil
 import json
+import re
 import logging
+import logging.handlers
+import queue
 import time
 import argparse
-import hashlib
+import atexit
+import signal
+import socket
+import tempfile
+import selectors
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from inotify_simple import INotify, flags
 
 # =========================
 # ENHANCED CONFIG & SETUP
@@ -27,6 +39,12 @@ BASE_DESTINATION = {
 for folder in BASE_DESTINATION.values():
     os.makedirs(folder, exist_ok=True)
 
+# The kernel emits CLOSE_WRITE once the downloader closes its fd and MOVED_TO
+# when a browser renames its temp file to the final name, so either one means
+# the file is complete.
+COMPLETE_EVENTS = flags.CLOSE_WRITE | flags.MOVED_TO
+WATCH_FLAGS = COMPLETE_EVENTS | flags.EXCL_UNLINK
+
 CONFIG_PATH = os.path.expanduser("~/.config/download_sorter.json")
 ENHANCED_DEFAULT_CONFIG = {
     "extensions": {
@@ -67,22 +85,75 @@ EXTENSIONS = CONFIG.get("extensions", ENHANCED_DEFAULT_CONFIG["extensions"])
 SETTINGS = CONFIG.get("settings", ENHANCED_DEFAULT_CONFIG["settings"])
 NOTIFICATIONS = CONFIG.get("notifications", ENHANCED_DEFAULT_CONFIG["notifications"])
 
+# Settings read on every file, looked up once
+ORGANIZE_BY_DATE = SETTINGS.get("organize_by_date", False)
+DATE_FMT = SETTINGS.get("date_format", "%Y/%m")
+DUP_ACTION = SETTINGS.get("duplicate_action", "rename")
+MIN_SIZE_KB = SETTINGS.get("min_file_size_kb", 0)
+MAX_AGE_DAYS = SETTINGS.get("max_file_age_days", 0)
+DRY_RUN = SETTINGS.get("dry_run", False)
+NOTIFY_ENABLED = NOTIFICATIONS.get("enabled", True)
+SHOW_SUMMARY = NOTIFICATIONS.get("show_summary", True)
+SUMMARY_INTERVAL_S = NOTIFICATIONS.get("summary_interval_minutes", 60) * 60
+
+# Lookup tables built once so per-file checks don't rescan the config
+EXT_TO_CATEGORY = {}
+for category, extensions in EXTENSIONS.items():
+    for ext in extensions:
+        EXT_TO_CATEGORY.setdefault(ext, category)  # First category listed wins
+
+EXCLUDE_LOWER = tuple(p.lower() for p in SETTINGS.get("exclude_patterns", []))
+TEMP_SUFFIXES = (".crdownload", ".part", ".tmp", ".temp")
+
+def _build_skip_re():
+    """Combine the name-only skip checks into one regex; the matched group names the reason."""
+    # Alternatives are tried in order: excluded, then temp suffix, then no
+    # extension (by the same rules as os.path.splitext)
+    alternatives = []
+    if EXCLUDE_LOWER:
+        alternatives.append(r"(?=.*?(?P<exclude>%s))" % "|".join(map(re.escape, EXCLUDE_LOWER)))
+    alternatives.append(r"(?=.*(?P<temp>%s)\Z)" % "|".join(map(re.escape, TEMP_SUFFIXES)))
+    alternatives.append(r"(?P<noext>\.*[^.]*\Z|.*\.\Z)")
+    return re.compile("^(?:%s)" % "|".join(alternatives), re.I | re.S)
+
+SKIP_RE = _build_skip_re()
+
+def category_for(filename):
+    """Return the category filename would be sorted into, or None if it would be skipped."""
+    if SKIP_RE.match(filename):
+        return None
+    return EXT_TO_CATEGORY.get(os.path.splitext(filename)[1][1:].lower())
+
 # =========================
 # ENHANCED LOGGING SETUP
 # =========================
 LOG_DIR = os.path.expanduser("~/.Script_Logs")
 LOG_FILE = os.path.join(LOG_DIR, "download_sorter.log")
 STATS_FILE = os.path.join(LOG_DIR, "sorter_stats.json")
+STATS_FLUSH_INTERVAL = 30  # Seconds between writes of changed stats
+# mkstemp creates files as 0600; stats keep the mode open() would give them.
+# Read once here, while the process is still single-threaded
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 os.makedirs(LOG_DIR, exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()  # Also log to console
-    ]
-)
+# Formatting and writing happen on a QueueListener thread, so logging from
+# the event loop or MOVE_POOL only enqueues the record
+_log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+_log_handlers = [
+    logging.FileHandler(LOG_FILE),
+    logging.StreamHandler()  # Also log to console
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.SimpleQueue()
+# The listener's handlers do the real formatting; keep the queued message bare
+logging.basicConfig(level=logging.INFO, format="%(message)s",
+                    handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 def log_message(message, level="info"):
     getattr(logging, level)(message)
@@ -94,6 +165,9 @@ class SorterStats:
     def __init__(self):
         self.stats_file = STATS_FILE
         self.stats = self.load_stats()
+        self._lock = threading.Lock()  # Moves are recorded from MOVE_POOL threads
+        self._version = 0  # Bumped on every change
+        self._saved_version = 0  # Version last written to disk
         
     def load_stats(self):
         default_stats = {
@@ -115,134 +189,251 @@ class SorterStats:
         return default_stats
     
     def save_stats(self):
-        with open(self.stats_file, "w") as f:
-            json.dump(self.stats, f, indent=2)
+        """Write stats atomically so a crash never leaves torn JSON behind."""
+        with self._lock:
+            snapshot = json.dumps(self.stats, indent=2)
+            version = self._version
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.stats_file), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(snapshot)
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+            os.replace(tmp_path, self.stats_file)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        # Only a completed write counts; changes made meanwhile stay unsaved
+        with self._lock:
+            self._saved_version = max(self._saved_version, version)
+    
+    def start_autosave(self, interval=STATS_FLUSH_INTERVAL):
+        """Flush changed stats every interval seconds and once more at exit."""
+        def flush():
+            try:
+                if self._version != self._saved_version:
+                    self.save_stats()
+            except Exception as e:
+                log_message(f"❌ Could not save stats: {e}", "error")
+            finally:
+                schedule()
+        
+        def schedule():
+            timer = threading.Timer(interval, flush)
+            timer.daemon = True
+            timer.start()
+        
+        atexit.register(self.save_stats)
+        schedule()
     
     def record_file_moved(self, category, file_size_mb):
-        self.stats["total_files_processed"] += 1
-        self.stats["files_by_category"][category] = self.stats["files_by_category"].get(category, 0) + 1
-        self.stats["total_size_moved_mb"] += file_size_mb
-        self.save_stats()
+        with self._lock:
+            self.stats["total_files_processed"] += 1
+            self.stats["files_by_category"][category] = self.stats["files_by_category"].get(category, 0) + 1
+            self.stats["total_size_moved_mb"] += file_size_mb
+            self._version += 1
     
     def record_error(self):
-        self.stats["errors"] += 1
-        self.save_stats()
+        with self._lock:
+            self.stats["errors"] += 1
+            self._version += 1
     
     def get_summary(self):
+        # Snapshot under the lock; mover threads may add categories meanwhile
+        with self._lock:
+            stats = {**self.stats, "files_by_category": dict(self.stats["files_by_category"])}
         return f"""
 📊 DOWNLOAD SORTER SUMMARY
-Total files processed: {self.stats['total_files_processed']}
-Total size moved: {self.stats['total_size_moved_mb']:.2f} MB
-Errors encountered: {self.stats['errors']}
-Files by category: {json.dumps(self.stats['files_by_category'], indent=2)}
-Session started: {self.stats['session_start']}
+Total files processed: {stats['total_files_processed']}
+Total size moved: {stats['total_size_moved_mb']:.2f} MB
+Errors encountered: {stats['errors']}
+Files by category: {json.dumps(stats['files_by_category'], indent=2)}
+Session started: {stats['session_start']}
 """
 
 # =========================
 # HELPER FUNCTIONS
 # =========================
-def is_file_complete(file_path, check_interval=1, checks=3):
-    """Check if file is completely downloaded by monitoring size and mtime stability."""
-    try:
-        stable_count = 0
-        prev_size = -1
-        prev_mtime = -1
-
-        for _ in range(checks):
-            stat = os.stat(file_path)
-            size = stat.st_size
-            mtime = stat.st_mtime
-
-            if size == prev_size and mtime == prev_mtime:
-                stable_count += 1
-            else:
-                stable_count = 0
-                prev_size = size
-                prev_mtime = mtime
-
-            if stable_count >= 2:
-                return True
-
-            time.sleep(check_interval)
-
-        return False
-    except (FileNotFoundError, OSError):
-        return False
-
-def get_file_hash(file_path, chunk_size=8192):
-    """Calculate MD5 hash of file for duplicate detection."""
-    hash_md5 = hashlib.md5()
-    try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(chunk_size), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except:
+def _date_bucket_seconds(fmt):
+    """How long a date_format folder name stays the same: 60, 1, or None if finer."""
+    # Try the format rather than parsing it, so %r, %OS/%ES and any other
+    # platform directives are handled
+    start = datetime(2000, 1, 1)
+    name = start.strftime(fmt)
+    if (start + timedelta(microseconds=1)).strftime(fmt) != name:
         return None
+    if (start + timedelta(seconds=1)).strftime(fmt) != name:
+        return 1
+    return 60
 
-def should_exclude_file(filename):
-    """Check if file should be excluded based on patterns."""
-    for pattern in SETTINGS.get("exclude_patterns", []):
-        if pattern.lower() in filename.lower():
-            return True
-    return False
+# Dated folders only change when the clock crosses a date_format boundary, so
+# each category's folder is reused (and makedirs skipped) within a minute, or
+# within a second if the format goes that fine
+_DATE_BUCKET_SECONDS = _date_bucket_seconds(DATE_FMT)
+_DATED_FOLDERS = {}  # category -> (time bucket, folder)
 
 def get_destination_path(category, filename):
     """Get the final destination path, optionally organized by date."""
     base_dest = BASE_DESTINATION[category]
     
-    if SETTINGS.get("organize_by_date", False):
-        date_folder = datetime.now().strftime(SETTINGS.get("date_format", "%Y/%m"))
+    if ORGANIZE_BY_DATE:
+        # Bucket and folder name come from the same instant so they agree
+        now = time.time()
+        bucket = int(now) // _DATE_BUCKET_SECONDS if _DATE_BUCKET_SECONDS else None
+        cached = _DATED_FOLDERS.get(category)
+        if bucket is not None and cached and cached[0] == bucket:
+            return cached[1]
+        
+        date_folder = datetime.fromtimestamp(now).strftime(DATE_FMT)
         dest_folder = os.path.join(base_dest, date_folder)
         os.makedirs(dest_folder, exist_ok=True)
+        if bucket is not None:
+            _DATED_FOLDERS[category] = (bucket, dest_folder)
         return dest_folder
     
     return base_dest
 
+_DEVICES = {}
+
+def get_device(folder):
+    """Return the st_dev of folder, cached after the first lookup."""
+    dev = _DEVICES.get(folder)
+    if dev is None:
+        dev = _DEVICES[folder] = os.stat(folder).st_dev
+    return dev
+
+# Folder pairs on one filesystem but different mount points (e.g. a bind
+# mount), where rename() fails with EXDEV and the data has to be copied
+_NEEDS_COPY = set()
+
+def can_rename(src_folder, dest_folder):
+    """Whether a file can be moved from src_folder to dest_folder with rename()."""
+    return (get_device(src_folder) == get_device(dest_folder) and
+            (src_folder, dest_folder) not in _NEEDS_COPY)
+
+def _rename_failed_across_mounts(error, src, dest):
+    """Remember the folder pair if error is EXDEV; return whether it was."""
+    if error.errno != errno.EXDEV:
+        return False
+    _NEEDS_COPY.add((os.path.dirname(src), os.path.dirname(dest)))
+    return True
+
+# renameat2(2) with RENAME_NOREPLACE fails with EEXIST instead of overwriting,
+# so checking for a free name and taking it is a single syscall
+AT_FDCWD = -100
+RENAME_NOREPLACE = 1
+try:
+    _renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    _renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+except (OSError, AttributeError):  # libc older than glibc 2.28
+    _renameat2 = None
+
+def rename_noreplace(src, dest):
+    """Rename src to dest atomically, raising FileExistsError if dest exists."""
+    if _renameat2 is not None:
+        if _renameat2(AT_FDCWD, os.fsencode(src), AT_FDCWD, os.fsencode(dest), RENAME_NOREPLACE) == 0:
+            return
+        err = ctypes.get_errno()
+        # EINVAL/ENOSYS: the kernel or filesystem doesn't support the flag
+        if err not in (errno.EINVAL, errno.ENOSYS):
+            raise OSError(err, os.strerror(err), src, None, dest)
+
+    if os.path.exists(dest):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), dest)
+    os.rename(src, dest)
+
+# Copies run one at a time per destination device so large files written to
+# the same disk don't thrash it; renames are metadata-only and never wait
+_DEVICE_LOCKS = defaultdict(threading.Lock)
+
+def _copy_across_devices(src, dest):
+    """Copy src to dest and remove src.
+
+    This is what shutil.move ends up doing across devices, minus the
+    isdir/samefile checks and the rename attempt we already know fails.
+    """
+    with _DEVICE_LOCKS[get_device(os.path.dirname(dest))]:
+        shutil.copy2(src, dest)
+    os.unlink(src)
+
+def _move_noreplace(src, dest):
+    """Move src to dest without overwriting, raising FileExistsError if dest is taken."""
+    if can_rename(os.path.dirname(src), os.path.dirname(dest)):
+        try:
+            rename_noreplace(src, dest)
+            return
+        except OSError as e:
+            if not _rename_failed_across_mounts(e, src, dest):
+                raise
+
+    # Across devices, reserve the name with O_EXCL before copying onto it
+    os.close(os.open(dest, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+    try:
+        _copy_across_devices(src, dest)
+    except BaseException:
+        os.remove(dest)
+        raise
+
 def safe_move(src, dest_folder, duplicate_action="rename"):
     """Enhanced file moving with duplicate handling options."""
     filename = os.path.basename(src)
     dest_path = os.path.join(dest_folder, filename)
-    
-    if not os.path.exists(dest_path):
-        shutil.move(src, dest_path)
+    # On the same filesystem a move is a single rename; data is only copied
+    # across devices
+    try:
+        _move_noreplace(src, dest_path)
         return dest_path
+    except FileExistsError:
+        pass
     
     # Handle duplicates based on action
     if duplicate_action == "skip":
         log_message(f"⏭️ Skipping {filename} - already exists in destination")
         return None
     elif duplicate_action == "replace":
+        if can_rename(os.path.dirname(src), dest_folder):
+            try:
+                os.replace(src, dest_path)
+                return dest_path
+            except OSError as e:
+                if not _rename_failed_across_mounts(e, src, dest_path):
+                    raise
         os.remove(dest_path)
-        shutil.move(src, dest_path)
+        _copy_across_devices(src, dest_path)
         return dest_path
     else:  # rename (default)
         base, ext = os.path.splitext(filename)
         counter = 1
-        while os.path.exists(dest_path):
+        while True:
             new_filename = f"{base}({counter}){ext}"
             dest_path = os.path.join(dest_folder, new_filename)
-            counter += 1
-        shutil.move(src, dest_path)
-        return dest_path
+            try:
+                _move_noreplace(src, dest_path)
+                return dest_path
+            except FileExistsError:
+                counter += 1
+
+# Moves run off the event thread
+MOVE_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="mover")
 
 def cleanup_temp_files():
     """Remove old temporary files from Downloads folder."""
-    temp_extensions = [".crdownload", ".part", ".tmp", ".temp"]
     cutoff_time = time.time() - (24 * 3600)  # 24 hours ago
     
     cleaned = 0
-    for file in os.listdir(DOWNLOADS_FOLDER):
-        file_path = os.path.join(DOWNLOADS_FOLDER, file)
-        if (os.path.isfile(file_path) and 
-            any(file.lower().endswith(ext) for ext in temp_extensions) and
-            os.path.getmtime(file_path) < cutoff_time):
-            try:
-                os.remove(file_path)
-                cleaned += 1
-                log_message(f"🧹 Cleaned old temp file: {file}")
-            except Exception as e:
-                log_message(f"❌ Could not clean {file}: {e}", "error")
+    with os.scandir(DOWNLOADS_FOLDER) as entries:
+        for entry in entries:
+            file = entry.name
+            # Name and file type come free with the directory listing, so
+            # only stat the entries that could actually be removed
+            if (file.lower().endswith(TEMP_SUFFIXES) and
+                entry.is_file(follow_symlinks=False) and
+                entry.stat(follow_symlinks=False).st_mtime < cutoff_time):
+                try:
+                    os.remove(entry.path)
+                    cleaned += 1
+                    log_message(f"🧹 Cleaned old temp file: {file}")
+                except Exception as e:
+                    log_message(f"❌ Could not clean {file}: {e}", "error")
     
     if cleaned > 0:
         log_message(f"🧹 Cleaned {cleaned} old temporary files")
@@ -250,107 +441,115 @@ def cleanup_temp_files():
 # =========================
 # ENHANCED MAIN SORTER
 # =========================
-class EnhancedDownloadSorter(FileSystemEventHandler):
+DEBOUNCE_SECONDS = 10
+DEBOUNCE_MAX_ENTRIES = 4096
+
+class EnhancedDownloadSorter:
     def __init__(self):
-        super().__init__()
-        self._recently_processed = {}
+        self._recently_processed = OrderedDict()  # (path, inode, size) -> monotonic time, oldest first
         self.stats = SorterStats()
+        self.stats.start_autosave()
         self.last_summary = time.time()
         
         # Initial cleanup if enabled
         if SETTINGS.get("auto_cleanup_temp", True):
             cleanup_temp_files()
 
-    def on_created(self, event):
-        if event.is_directory:
-            return
-        self._process_event(event.src_path)
-
-    def on_modified(self, event):
-        if event.is_directory:
-            return
-        self._process_event(event.src_path)
-
-    def _process_event(self, file_path):
+    def _process_event(self, file_path, event_mask):
         now = time.time()
         
         # Show periodic summary
-        if (NOTIFICATIONS.get("show_summary", True) and 
-            now - self.last_summary > NOTIFICATIONS.get("summary_interval_minutes", 60) * 60):
+        if SHOW_SUMMARY and now - self.last_summary > SUMMARY_INTERVAL_S:
             log_message(self.stats.get_summary())
             self.last_summary = now
         
-        # Debounce processing
-        last_time = self._recently_processed.get(file_path, 0)
-        if now - last_time < 10:
-            return
-        self._recently_processed[file_path] = now
-
-        self.sort_file(file_path)
+        self.sort_file(file_path, event_mask=event_mask)
+
+    def _seen_recently(self, file_path, st):
+        """Debounce repeat events for the same file contents.
+
+        Keyed on inode and size as well as path, so a file renamed over an
+        earlier one or rewritten with new contents is sorted again.
+        """
+        # Monotonic, so timestamps stay in order across wall-clock steps
+        now = time.monotonic()
+        key = (file_path, st.st_ino, st.st_size)
+        recent = self._recently_processed
+        last_time = recent.get(key)
+        if last_time is not None and now - last_time < DEBOUNCE_SECONDS:
+            return True
+        recent[key] = now
+        recent.move_to_end(key)
+        
+        # Entries are kept in time order, so expired ones are at the front
+        while recent and (len(recent) > DEBOUNCE_MAX_ENTRIES or
+                          now - next(iter(recent.values())) >= DEBOUNCE_SECONDS):
+            recent.popitem(last=False)
+        return False
 
-    def sort_file(self, file_path):
-        """Enhanced file sorting with all new features."""
-        if not os.path.isfile(file_path):
-            return
+    def sort_file(self, file_path, st=None, inline=False, event_mask=0):
+        """Enhanced file sorting with all new features.
 
+        st is an optional os.stat result to reuse; inline moves the file on
+        the calling thread instead of handing it to MOVE_POOL; event_mask is
+        the inotify mask when called for an event from the monitor loop.
+        """
         filename = os.path.basename(file_path)
         
-        # Check exclusion patterns
-        if should_exclude_file(filename):
-            log_message(f"⚠️ Excluding file: {filename}")
+        # Name-based checks come first so files that will never be moved
+        # cost no syscalls at all
+        
+        # Exclusion patterns, temporary files and missing extensions
+        skip = SKIP_RE.match(filename)
+        if skip:
+            if skip.lastgroup == "exclude":
+                log_message(f"⚠️ Excluding file: {filename}")
+            elif skip.lastgroup == "temp":
+                # Browsers close these before renaming them, and the rename
+                # arrives as its own MOVED_TO event
+                log_message(f"⏳ Skipping temporary file: {filename}")
+            else:
+                log_message(f"⚠️ No extension found for: {filename}")
             return
 
-        # Skip temporary files
-        if filename.lower().endswith((".crdownload", ".part", ".tmp", ".temp")):
-            log_message(f"⏳ Skipping temporary file: {filename}")
+        # Determine file category
+        file_ext = os.path.splitext(filename)[1][1:].lower()
+        category = EXT_TO_CATEGORY.get(file_ext)
+        if not category:
+            log_message(f"⚠️ Unknown file type '.{file_ext}' for: {filename}")
             return
 
-        # Check file age if configured
-        max_age_days = SETTINGS.get("max_file_age_days", 0)
-        if max_age_days > 0:
-            file_age = (time.time() - os.path.getmtime(file_path)) / (24 * 3600)
-            if file_age > max_age_days:
-                log_message(f"⏳ Skipping old file: {filename} (age: {file_age:.1f} days)")
+        # One stat serves the type, age and size checks below
+        if st is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
                 return
-
-        # Wait for file completion
-        max_retries = 7
-        for attempt in range(1, max_retries + 1):
-            if is_file_complete(file_path, check_interval=1, checks=3):
-                break
-            log_message(f"⏳ Waiting for {filename} to complete... (Attempt {attempt}/{max_retries})")
-            time.sleep(2)
-        else:
-            log_message(f"❌ File {filename} did not stabilize; skipping", "error")
-            self.stats.record_error()
+        if not stat.S_ISREG(st.st_mode):
             return
-
-        # Check minimum file size
-        try:
-            file_size_kb = os.path.getsize(file_path) / 1024
-            min_size = SETTINGS.get("min_file_size_kb", 0)
-            if min_size > 0 and file_size_kb < min_size:
-                log_message(f"⏳ Skipping small file: {filename} ({file_size_kb:.1f} KB)")
-                return
-        except OSError:
-            log_message(f"❌ Could not get size for {filename}", "error")
+        # Firefox creates an empty placeholder under the final name (its
+        # CLOSE_WRITE arrives first) and later renames name.part onto it, so
+        # an empty closed file isn't a finished download; MOVED_TO sorts it
+        if event_mask & flags.CLOSE_WRITE and st.st_size == 0:
+            log_message(f"⏳ Skipping empty placeholder: {filename}")
             return
 
-        # Determine file category
-        if "." not in filename:
-            log_message(f"⚠️ No extension found for: {filename}")
+        # Repeat events only come from the single-threaded monitor loop, so
+        # organize passes (possibly multi-threaded) skip the debounce
+        if event_mask and self._seen_recently(file_path, st):
             return
 
-        file_ext = filename.split(".")[-1].lower()
-        category = None
-        
-        for cat, extensions in EXTENSIONS.items():
-            if file_ext in extensions:
-                category = cat
-                break
+        # Check file age if configured
+        if MAX_AGE_DAYS > 0:
+            file_age = (time.time() - st.st_mtime) / (24 * 3600)
+            if file_age > MAX_AGE_DAYS:
+                log_message(f"⏳ Skipping old file: {filename} (age: {file_age:.1f} days)")
+                return
 
-        if not category:
-            log_message(f"⚠️ Unknown file type '.{file_ext}' for: {filename}")
+        # Check minimum file size
+        file_size_kb = st.st_size / 1024
+        if MIN_SIZE_KB > 0 and file_size_kb < MIN_SIZE_KB:
+            log_message(f"⏳ Skipping small file: {filename} ({file_size_kb:.1f} KB)")
             return
 
         # Get destination folder
@@ -359,13 +558,26 @@ class EnhancedDownloadSorter(FileSystemEventHandler):
             log_message(f"➡️ Processing {filename} → {category}")
 
             # Dry run mode
-            if SETTINGS.get("dry_run", False):
+            if DRY_RUN:
                 log_message(f"🔍 [DRY RUN] Would move: {filename} → {dest_folder}")
                 return
 
-            # Move file
+            if inline:
+                self._move_file(file_path, dest_folder, category, file_size_kb, DUP_ACTION)
+            else:
+                # Move file in the background so the next event isn't blocked
+                MOVE_POOL.submit(self._move_file, file_path, dest_folder, category,
+                                 file_size_kb, DUP_ACTION)
+
+        except Exception as e:
+            log_message(f"❌ Error processing {filename}: {e}", "error")
+            self.stats.record_error()
+
+    def _move_file(self, file_path, dest_folder, category, file_size_kb, duplicate_action):
+        """Move a sorted file and record the result. Runs on MOVE_POOL."""
+        filename = os.path.basename(file_path)
+        try:
             start_time = time.time()
-            duplicate_action = SETTINGS.get("duplicate_action", "rename")
             final_path = safe_move(file_path, dest_folder, duplicate_action)
             
             if final_path:  # File was moved (not skipped)
@@ -377,7 +589,7 @@ class EnhancedDownloadSorter(FileSystemEventHandler):
                 
                 log_message(f"✅ Moved: {filename} ({file_size_kb:.1f} KB) → {category} in {duration}s")
                 
-                if NOTIFICATIONS.get("enabled", True):
+                if NOTIFY_ENABLED:
                     log_message(f"📁 Total files processed: {self.stats.stats['total_files_processed']}")
 
         except Exception as e:
@@ -397,21 +609,42 @@ def parse_arguments():
                        help="Show statistics and exit")
     parser.add_argument("--organize-existing", action="store_true",
                        help="Organize existing files in Downloads folder once and exit")
+    parser.add_argument("--threads", type=int, default=4,
+                       help="Worker threads for --organize-existing (1 = process files one by one)")
     return parser.parse_args()
 
-def organize_existing_files():
+def organize_existing_files(threads=4):
     """One-time organization of existing files in Downloads folder."""
     log_message("🔄 Organizing existing files in Downloads folder...")
     sorter = EnhancedDownloadSorter()
     
-    processed = 0
-    for filename in os.listdir(DOWNLOADS_FOLDER):
-        file_path = os.path.join(DOWNLOADS_FOLDER, filename)
-        if os.path.isfile(file_path):
-            sorter.sort_file(file_path)
-            processed += 1
+    with os.scandir(DOWNLOADS_FOLDER) as entries:
+        files = [entry for entry in entries if entry.is_file(follow_symlinks=False)]
+    
+    # Moves run inline on this pass's own threads, so --threads sets how many
+    # run at once (still one at a time per destination device)
+    if threads <= 1:
+        for entry in files:
+            sorter.sort_file(entry.path, inline=True)
+    else:
+        # Largest files first, so a big copy isn't the last thing left running.
+        # Only files that will be moved are statted; the rest only go through
+        # sort_file to log why they are skipped
+        sized, skipped = [], []
+        for entry in files:
+            if category_for(entry.name) is None:
+                skipped.append((entry.path, None))
+                continue
+            try:
+                sized.append((entry.path, entry.stat(follow_symlinks=False)))
+            except OSError:
+                pass  # Removed since the listing
+        sized.sort(key=lambda item: item[1].st_size, reverse=True)
+        
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda item: sorter.sort_file(*item, inline=True), sized + skipped))
     
-    log_message(f"✅ Finished organizing {processed} existing files")
+    log_message(f"✅ Finished organizing {len(files)} existing files")
     log_message(sorter.stats.get_summary())
 
 # =========================
@@ -420,6 +653,10 @@ def organize_existing_files():
 if __name__ == "__main__":
     args = parse_arguments()
     
+    # Treat SIGTERM like Ctrl+C so pending moves and stats are flushed; the
+    # monitor loop installs its own handlers below
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    
     # Handle command line options
     if args.stats:
         stats = SorterStats()
@@ -431,12 +668,12 @@ if __name__ == "__main__":
         exit(0)
     
     if args.organize_existing:
-        organize_existing_files()
+        organize_existing_files(args.threads)
         exit(0)
     
     # Set dry run mode if specified
     if args.dry_run:
-        SETTINGS["dry_run"] = True
+        SETTINGS["dry_run"] = DRY_RUN = True
         log_message("🔍 DRY RUN MODE ENABLED - No files will actually be moved")
     
     # Start monitoring
@@ -444,17 +681,49 @@ if __name__ == "__main__":
     log_message(f"📊 Configuration: {json.dumps(SETTINGS, indent=2)}")
     
     event_handler = EnhancedDownloadSorter()
-    observer = Observer()
-    observer.schedule(event_handler, DOWNLOADS_FOLDER, recursive=False)
-    observer.start()
-
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        observer.stop()
-        log_message("🛑 Stopping Download Sorter...")
-        log_message(event_handler.stats.get_summary())
-
-    observer.join()
+    inotify = INotify()
+    inotify.add_watch(DOWNLOADS_FOLDER, WATCH_FLAGS)
+    selector = selectors.DefaultSelector()
+    selector.register(inotify, selectors.EVENT_READ)
+
+    # SIGINT/SIGTERM only set stop_event; the signal module writes to the
+    # wakeup socket so select() returns and the current batch finishes
+    # before shutdown
+    stop_event = threading.Event()
+    wakeup_r, wakeup_w = socket.socketpair()
+    wakeup_r.setblocking(False)
+    wakeup_w.setblocking(False)
+    signal.set_wakeup_fd(wakeup_w.fileno())
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+    selector.register(wakeup_r, selectors.EVENT_READ)
+
+    while not stop_event.is_set():
+        selector.select()
+        # Drain everything queued before selecting again so bursts of
+        # downloads are never left sitting in the kernel buffer
+        events = inotify.read(timeout=0)
+        while events:
+            for event in events:
+                if event.mask & flags.Q_OVERFLOW:
+                    log_message("⚠️ inotify queue overflowed; some downloads may need --organize-existing", "warning")
+                if event.mask & flags.ISDIR or not event.mask & COMPLETE_EVENTS:
+                    continue
+                event_handler._process_event(os.path.join(DOWNLOADS_FOLDER, event.name), event.mask)
+            events = inotify.read(timeout=0)
+
+    # Waiting for queued moves can take a while; a second Ctrl+C (or SIGTERM)
+    # should interrupt it rather than be swallowed by stop_event
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal.default_int_handler)
+
+    log_message("🛑 Stopping Download Sorter...")
+    MOVE_POOL.shutdown(wait=True)
+    log_message(event_handler.stats.get_summary())
+
+    signal.set_wakeup_fd(-1)
+    selector.close()
+    wakeup_r.close()
+    wakeup_w.close()
+    inotify.close()
     log_message("👋 Download Sorter stopped.")
\ No newline at end of file